@@ -3,13 +3,23 @@ import logging
 from itertools import chain
 
 import rdflib
-from sqlalchemy import Table, Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import Table, Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, backref, synonym
 from sqlalchemy.orm.collections import collection
 
 logger = logging.getLogger(__name__)
 
+# use an Oxigraph-backed store when the optional oxrdflib package is
+# available: its indexes keep lookups on large built graphs from
+# degenerating into full triple scans
+try:
+    import oxrdflib  # noqa: F401
+except ImportError:
+    _GRAPH_STORE = "default"
+else:
+    _GRAPH_STORE = "Oxigraph"
+
 
 def info(*args, **kwargs):
     logger.info(*args, **kwargs)
@@ -22,40 +32,106 @@ def debug(*args, **kwargs):
 # Create a SQLAlchemy declarative base class using our metaclass
 Base = declarative_base()
 
-# association tables for many to many joins
+# URIRef constants used on the load path; building them once at module
+# load avoids re-allocating the same terms on every call
+_RDF_TYPE = rdflib.URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+_SKOS = rdflib.Namespace("http://www.w3.org/2004/02/skos/core#")
+_OWL_SAME_AS = rdflib.URIRef("http://www.w3.org/2006/12/owl2-xml#sameAs")
+_DC_TERMS = rdflib.Namespace("http://purl.org/dc/terms/")
+_DC_ELEMENTS = rdflib.Namespace("http://purl.org/dc/elements/1.1/")
+
+_PRED_DEFINITION = _SKOS["definition"]
+_PRED_NOTATION = _SKOS["notation"]
+_PRED_ALT_LABEL = _SKOS["altLabel"]
+_PRED_NOTE = _SKOS["note"]
+_PRED_MEMBER = _SKOS["member"]
+_PRED_PREF_LABEL = _SKOS["prefLabel"]
+_PRED_EXACT_MATCH = _SKOS["exactMatch"]
+_PRED_RELATED = _SKOS["related"]
+_PRED_BROADER = _SKOS["broader"]
+_PRED_NARROWER = _SKOS["narrower"]
+_PRED_HAS_TOP_CONCEPT = _SKOS["hasTopConcept"]
+_RDFS_LABEL = rdflib.namespace.RDFS.label
+
+_TYPE_CONCEPT = _SKOS["Concept"]
+_TYPE_COLLECTION = _SKOS["Collection"]
+_TYPE_CONCEPT_SCHEME = _SKOS["ConceptScheme"]
+
+_DC_TITLE = _DC_ELEMENTS["title"]
+_DC_DESCRIPTION = _DC_ELEMENTS["description"]
+_DC_DATE = _DC_ELEMENTS["date"]
+
+_PRED_TITLES = (_DC_TERMS["title"], _DC_ELEMENTS["title"])
+_PRED_DESCRIPTIONS = (_DC_TERMS["description"], _DC_ELEMENTS["description"])
+_PRED_DATES = (_DC_TERMS["date"], _DC_ELEMENTS["date"])
+
+_RESOLVABLE_PREDICATES = (
+    _PRED_BROADER,
+    _PRED_NARROWER,
+    _PRED_EXACT_MATCH,
+    _OWL_SAME_AS,
+    _PRED_RELATED,
+    _PRED_MEMBER,
+)
+
+_RESOLVABLE_OBJECTS = (
+    _TYPE_CONCEPT_SCHEME,
+    _TYPE_CONCEPT,
+    _TYPE_COLLECTION,
+    _PRED_HAS_TOP_CONCEPT,
+)
+
+# mapping of relationship predicates to the Concept attribute they
+# populate
+_RELATION_ATTRS = {
+    _PRED_NARROWER: "narrower",
+    _PRED_BROADER: "broader",
+    _PRED_RELATED: "related",
+    _PRED_EXACT_MATCH: "synonyms",
+    _OWL_SAME_AS: "synonyms",
+}
+
+# association tables for many to many joins; both foreign keys form a
+# composite primary key and the second column carries its own index so
+# that lookups in either direction avoid a full table scan
 concept_broader = Table(
     "concept_broader",
     Base.metadata,
-    Column("broader_uri", String(255), ForeignKey("concept.uri")),
-    Column("narrower_uri", String(255), ForeignKey("concept.uri")),
+    Column("broader_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Column("narrower_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Index("ix_concept_broader_narrower", "narrower_uri"),
 )
 
 concept_synonyms = Table(
     "concept_synonyms",
     Base.metadata,
-    Column("left_uri", String(255), ForeignKey("concept.uri")),
-    Column("right_uri", String(255), ForeignKey("concept.uri")),
+    Column("left_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Column("right_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Index("ix_concept_synonyms_right", "right_uri"),
 )
 
 concept_related = Table(
     "concept_related",
     Base.metadata,
-    Column("left_uri", String(255), ForeignKey("concept.uri")),
-    Column("right_uri", String(255), ForeignKey("concept.uri")),
+    Column("left_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Column("right_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Index("ix_concept_related_right", "right_uri"),
 )
 
 concepts2schemes = Table(
     "concepts2schemes",
     Base.metadata,
-    Column("scheme_uri", String(255), ForeignKey("concept_scheme.uri")),
-    Column("concept_uri", String(255), ForeignKey("concept.uri")),
+    Column("scheme_uri", String(255), ForeignKey("concept_scheme.uri"), primary_key=True),
+    Column("concept_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Index("ix_concepts2schemes_concept", "concept_uri"),
 )
 
 concepts2collections = Table(
     "concepts2collections",
     Base.metadata,
-    Column("collection_uri", String(255), ForeignKey("collection.uri")),
-    Column("concept_uri", String(255), ForeignKey("concept.uri")),
+    Column("collection_uri", String(255), ForeignKey("collection.uri"), primary_key=True),
+    Column("concept_uri", String(255), ForeignKey("concept.uri"), primary_key=True),
+    Index("ix_concepts2collections_concept", "concept_uri"),
 )
 
 
@@ -76,14 +152,18 @@ def _create_attribute_mapping(name):  # noqa: C901
     """
 
     class AttributeJoin(collections.abc.MutableSet, collections.abc.Mapping):
+        __slots__ = ("_left", "_right")
+
         def __init__(self, concept):
             self._left = getattr(concept, "_%s_left" % name)
             self._right = getattr(concept, "_%s_right" % name)
 
         # Implement the interface for `collections.Iterable`
         def __iter__(self):
-            self._left.update(self._right)
-            return iter(self._left)
+            # chain both sides rather than merging the right side into
+            # the left, which mutated the underlying relationship
+            left = self._left
+            return chain(left, (key for key in self._right if key not in left))
 
         # Implement the interface for `collections.Container`
         def __contains__(self, value):
@@ -91,7 +171,7 @@ def _create_attribute_mapping(name):  # noqa: C901
 
         # Implement the interface for `collections.Sized`
         def __len__(self):
-            return len(set(list(self._left.keys()) + list(self._right.keys())))
+            return len(self._left.keys() | self._right.keys())
 
         # Implement the interface for `collections.MutableSet`
         def add(self, value):
@@ -102,13 +182,12 @@ def _create_attribute_mapping(name):  # noqa: C901
             self._right.discard(value)
 
         def pop(self):
-            try:
-                value = self._concepts._synonyms_left.pop()
-            except KeyError:
-                value = self._concepts._synonyms_right.pop()
-                self._concepts._synonyms_left.discard(value)
+            if self._left:
+                value = self._left.pop()
+                self._right.discard(value)
             else:
-                self._concepts._synonyms_right.discard(value)
+                value = self._right.pop()
+                self._left.discard(value)
             return value
 
         # Implement the interface for `collections.Mapping` with the
@@ -161,6 +240,11 @@ class Concepts(collections.abc.Mapping, collections.abc.MutableSet):
     implementation.
     """
 
+    # a wrapper is created per relationship access, so keep instances
+    # dict-free; InstrumentedConcepts regains a __dict__ automatically,
+    # which SQLAlchemy's instrumentation requires
+    __slots__ = ("_concepts",)
+
     def __init__(self, values=None):
         self._concepts = {}
         if values:
@@ -172,12 +256,9 @@ class Concepts(collections.abc.Mapping, collections.abc.MutableSet):
 
     # Implement the interface for `collections.Container`
     def __contains__(self, value):
-        try:
-            # if it's a Concept, get the Concept's key to test
-            value = value.uri
-        except AttributeError:
-            pass
-        return value in self._concepts
+        # if it's a Concept, test against the Concept's key; otherwise
+        # treat the value itself as a key
+        return getattr(value, "uri", value) in self._concepts
 
     # Implement the interface for `collections.Sized`
     def __len__(self):
@@ -214,12 +295,9 @@ class Concepts(collections.abc.Mapping, collections.abc.MutableSet):
         The argument can be a dictionary-like container of concepts or
         a sequence of concepts.
         """
-        if not isinstance(concepts, collections.abc.Mapping):
-            iterator = iter(concepts)
-        else:
-            iterator = iter(concepts.values())
-        for value in iterator:
-            self.add(value)
+        if isinstance(concepts, collections.abc.Mapping):
+            concepts = concepts.values()
+        self._concepts.update((value.uri, value) for value in concepts)
 
     def __eq__(self, other):
         try:
@@ -247,17 +325,21 @@ class InstrumentedConcepts(Concepts):
     # subclass" trick detailed at
     # <http://docs.sqlalchemy.org/en/latest/orm/collections.html#instrumentation-and-custom-types>.
 
+    # the instrumented methods operate on the underlying dict directly
+    # rather than delegating through `super()`: SQLAlchemy invokes them
+    # for every collection operation, so each saved Python frame counts
+
     @collection.iterator
     def itervalues(self):
-        return iter(super(InstrumentedConcepts, self).values())
+        return iter(self._concepts.values())
 
     @collection.appender
-    def add(self, *args, **kwargs):
-        return super(InstrumentedConcepts, self).add(*args, **kwargs)
+    def add(self, value):
+        self._concepts[value.uri] = value
 
     @collection.remover
-    def discard(self, *args, **kwargs):
-        return super(InstrumentedConcepts, self).discard(*args, **kwargs)
+    def discard(self, value):
+        self._concepts.pop(value.uri, None)
 
     @collection.converter
     @collection.internally_instrumented
@@ -326,7 +408,12 @@ class Concept(Object):
         primaryjoin=uri == concept_broader.c.narrower_uri,
         secondaryjoin=uri == concept_broader.c.broader_uri,
         collection_class=InstrumentedConcepts,
-        backref=backref("narrower", collection_class=InstrumentedConcepts),
+        lazy="selectin",
+        backref=backref(
+            "narrower",
+            collection_class=InstrumentedConcepts,
+            lazy="selectin",
+        ),
     )
 
     # many to many Concept <-> Concept representing relationship
@@ -336,9 +423,11 @@ class Concept(Object):
         primaryjoin=uri == concept_related.c.left_uri,
         secondaryjoin=uri == concept_related.c.right_uri,
         collection_class=InstrumentedConcepts,
+        lazy="selectin",
         backref=backref(
             "_related_right",
-            collection_class=InstrumentedConcepts
+            collection_class=InstrumentedConcepts,
+            lazy="selectin",
         ),
     )
 
@@ -349,9 +438,11 @@ class Concept(Object):
         primaryjoin=uri == concept_synonyms.c.left_uri,
         secondaryjoin=uri == concept_synonyms.c.right_uri,
         collection_class=InstrumentedConcepts,
+        lazy="selectin",
         backref=backref(
             "_synonyms_right",
-            collection_class=InstrumentedConcepts
+            collection_class=InstrumentedConcepts,
+            lazy="selectin",
         ),
     )
 
@@ -382,42 +473,31 @@ class Concept(Object):
         return "<%s('%s')>" % (self.__class__.__name__, self.uri)
 
     def __hash__(self):
-        attrs = [
-            "uri",
-            "prefLabel",
-            "definition",
-            "notation",
-            "altLabel",
-            "note",
-        ]
-        return hash(
-            "".join(
-                (
-                    v
-                    for v in (
-                        getattr(self, attr)
-                        for attr in attrs
-                    )
-                    if v
-                )
-            )
-        )
+        return hash((
+            self.uri,
+            self.prefLabel,
+            self.definition,
+            self.notation,
+            self.altLabel,
+            self.note,
+        ))
 
     def __eq__(self, other):
-        attrs = [
-            "uri",
-            "prefLabel",
-            "definition",
-            "notation",
-            "altLabel",
-            "note",
-        ]
         try:
-            return min(
-                [
-                    getattr(self, attr) == getattr(other, attr)
-                    for attr in attrs
-                ]
+            return (
+                self.uri,
+                self.prefLabel,
+                self.definition,
+                self.notation,
+                self.altLabel,
+                self.note,
+            ) == (
+                other.uri,
+                other.prefLabel,
+                other.definition,
+                other.notation,
+                other.altLabel,
+                other.note,
             )
         except AttributeError:
             return False
@@ -450,34 +530,31 @@ class ConceptScheme(Object):
         "Concept",
         secondary=concepts2schemes,
         collection_class=InstrumentedConcepts,
-        backref=backref("schemes", collection_class=InstrumentedConcepts),
+        lazy="selectin",
+        backref=backref(
+            "schemes",
+            collection_class=InstrumentedConcepts,
+            lazy="selectin",
+        ),
     )
 
     def __repr__(self):
         return "<%s('%s')>" % (self.__class__.__name__, self.uri)
 
     def __hash__(self):
-        attrs = [
-            "uri",
-            "title",
-            "description"
-        ]
-        return hash(
-            "".join((getattr(self, attr) for attr in attrs))
-        )
+        return hash((self.uri, self.title, self.description))
 
     def __eq__(self, other):
-        attrs = [
-            "uri",
-            "title",
-            "description",
-            "concepts"
-        ]
-        return min(
-            [
-                getattr(self, attr) == getattr(other, attr)
-                for attr in attrs
-            ]
+        return (
+            self.uri,
+            self.title,
+            self.description,
+            self.concepts,
+        ) == (
+            other.uri,
+            other.title,
+            other.description,
+            other.concepts,
         )
 
 
@@ -504,42 +581,34 @@ class Collection(Object):
         "Concept",
         secondary=concepts2collections,
         collection_class=InstrumentedConcepts,
-        backref=backref("collections", collection_class=InstrumentedConcepts),
+        lazy="selectin",
+        backref=backref(
+            "collections",
+            collection_class=InstrumentedConcepts,
+            lazy="selectin",
+        ),
     )
 
     def __repr__(self):
         return "<%s('%s')>" % (self.__class__.__name__, self.uri)
 
     def __hash__(self):
-        attrs = [
-            "uri",
-            "title",
-            "description",
-            "date"
-        ]
-        return hash(
-            "".join(
-                (
-                    str(getattr(self, attr))
-                    for attr in attrs
-                )
-            )
-        )
+        return hash((self.uri, self.title, self.description, self.date))
 
     def __eq__(self, other):
-        attrs = [
-            "uri",
-            "title",
-            "description",
-            "members",
-            "date"
-        ]
         try:
-            return min(
-                [
-                    getattr(self, attr) == getattr(other, attr)
-                    for attr in attrs
-                ]
+            return (
+                self.uri,
+                self.title,
+                self.description,
+                self.members,
+                self.date,
+            ) == (
+                other.uri,
+                other.title,
+                other.description,
+                other.members,
+                other.date,
             )
         except AttributeError:
             return False
@@ -596,7 +665,7 @@ class RDFLoader(collections.abc.Mapping):
         except ParseError:
             return None
 
-    def _resolveGraph(self, graph, depth=0, resolved=None):
+    def _resolveGraph(self, graph, normalise_uri, depth=0, resolved=None):
         """
         Resolve external RDF resources
         """
@@ -606,39 +675,20 @@ class RDFLoader(collections.abc.Mapping):
         if resolved is None:
             resolved = set()
 
-        resolvable_predicates = (
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#broader"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#narrower"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#exactMatch"),
-            rdflib.URIRef("http://www.w3.org/2006/12/owl2-xml#sameAs"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#related"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#member"),
-        )
-
-        resolvable_objects = (
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#ConceptScheme"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Concept"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#Collection"),
-            rdflib.URIRef("http://www.w3.org/2004/02/skos/core#hasTopConcept"),
-        )
-
-        normalise_uri = self.normalise_uri
         # add existing resolved objects
-        for object_ in resolvable_objects:
+        for object_ in _RESOLVABLE_OBJECTS:
             resolved.update(
                 (
                     normalise_uri(subject)
                     for subject in graph.subjects(
-                        predicate=rdflib.URIRef(
-                            "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
-                        ),
+                        predicate=_RDF_TYPE,
                         object=object_,
                     )
                 )
             )
 
         unresolved = set()
-        for predicate in resolvable_predicates:
+        for predicate in _RESOLVABLE_PREDICATES:
             for subject, object_ in graph.subject_objects(predicate=predicate):
                 uri = normalise_uri(object_)
                 if uri not in resolved:
@@ -652,187 +702,166 @@ class RDFLoader(collections.abc.Mapping):
         for uri in unresolved:
             info("parsing %s", uri)
             subgraph = graph.parse(uri)
-            self._resolveGraph(subgraph, depth + 1, resolved)
-
-    def _iterateType(self, graph, type_):
-        """
-        Iterate over all subjects of a specific SKOS type
-        """
-        predicate = rdflib.URIRef(
-            "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
-        )
-        object_ = rdflib.URIRef(
-            "http://www.w3.org/2004/02/skos/core#%s" % type_
-        )
-        for subject in graph.subjects(predicate=predicate, object=object_):
-            yield subject
+            self._resolveGraph(subgraph, normalise_uri, depth + 1, resolved)
 
-    def _get_value_for_lang(self, graph, subject, predicate, lang):
-        objects = graph.objects(subject=subject, predicate=predicate)
-        if not objects:
+    def _get_value_for_lang(self, values_by_lang, lang):
+        if not values_by_lang:
             return None
-
-        for obj in objects:
-            if hasattr(obj, "language") and obj.language == lang:
-                return obj.value
-
-        return None
+        return values_by_lang.get(lang)
 
     def _preferredLabel(
             self,
-            graph,
-            subject,
+            label_lists,
             lang=None,
             default=None
     ):
         """
-        Find the preferred label for subject.
-
-        By default prefers skos:prefLabels over rdfs:labels. In case at least
-        one prefLabel is found returns those, else returns labels. In case a
-        language string (e.g., "en", "de" or even "" for no lang-tagged
-        literals) is given, only such labels will be considered.
-
-        Return a list of (labelProp, label) pairs, where labelProp is either
-        skos:prefLabel or rdfs:label.
+        Find the preferred label for a subject.
+
+        `label_lists` is a sequence of (labelProp, labels) pairs, in
+        order of preference, where labels are the literals grouped by
+        subject for that label property. By default skos:prefLabels are
+        preferred over rdfs:labels. In case at least one prefLabel is
+        found those are returned, else labels. In case a language string
+        (e.g., "en", "de" or even "" for no lang-tagged literals) is
+        given, only such labels will be considered.
+
+        Return a list of (labelProp, label) pairs, where labelProp is
+        either skos:prefLabel or rdfs:label.
         """
         if default is None:
             default = []
 
-        labelProperties = [
-            rdflib.namespace.SKOS.prefLabel,
-            rdflib.namespace.RDFS.label
-        ]
+        if lang is None:
+            # we don't care about language tags, so the first non-empty
+            # label list wins without any filtering
+            for labelProp, labels in label_lists:
+                if labels:
+                    return [(labelProp, label) for label in labels]
+            return default
 
         # setup the language filtering
-        if lang is not None:
-            if lang == "":  # we only want not language-tagged literals
-
-                def langfilter(label):
-                    return label.language is None
-
-            else:
+        if lang == "":  # we only want not language-tagged literals
 
-                def langfilter(label):
-                    return label.language == lang
+            def langfilter(label):
+                return label.language is None
 
-        else:  # we don't care about language tags
+        else:
 
             def langfilter(label):
-                return True
+                return label.language == lang
 
-        for labelProp in labelProperties:
-            labels = list(filter(langfilter, graph.objects(subject, labelProp)))
-            if len(labels) == 0:
-                continue
-            else:
-                return [(labelProp, label) for label in labels]
+        for labelProp, labels in label_lists:
+            matched = [
+                (labelProp, label)
+                for label in labels or ()
+                if langfilter(label)
+            ]
+            if matched:
+                return matched
         return default
 
-    def _loadConcepts(self, graph, cache, lang):
+    def _loadConcepts(self, graph, cache, lang, normalise_uri, subjects):
         # generate all the concepts
-        concepts = set()
-        normalise_uri = self.normalise_uri
-        pred_definition = rdflib.URIRef(
-            "http://www.w3.org/2004/02/skos/core#definition"
-        )
-        pred_notation = rdflib.URIRef(
-            "http://www.w3.org/2004/02/skos/core#notation"
-        )
-        pred_altLabel = rdflib.URIRef(
-            "http://www.w3.org/2004/02/skos/core#altLabel"
-        )
-        pred_note = rdflib.URIRef(
-            "http://www.w3.org/2004/02/skos/core#note"
-        )
-
         default_label = [[None, type("obj", (object,), {"value": ""})]]
 
-        for subject in self._iterateType(graph, "Concept"):
+        # one linear scan per predicate, grouping objects by subject,
+        # instead of an index lookup per subject and predicate; the
+        # language-tagged predicates are indexed per subject by language
+        # tag so that _get_value_for_lang is a pair of dict lookups
+        definitions = {}
+        for subject, object_ in graph.subject_objects(predicate=_PRED_DEFINITION):
+            if hasattr(object_, "language"):
+                definitions.setdefault(subject, {}).setdefault(
+                    object_.language, object_.value
+                )
+        altLabels = {}
+        for subject, object_ in graph.subject_objects(predicate=_PRED_ALT_LABEL):
+            if hasattr(object_, "language"):
+                altLabels.setdefault(subject, {}).setdefault(
+                    object_.language, object_.value
+                )
+        notations = {}
+        for subject, object_ in graph.subject_objects(predicate=_PRED_NOTATION):
+            notations.setdefault(subject, object_)
+        notes = {}
+        for subject, object_ in graph.subject_objects(predicate=_PRED_NOTE):
+            notes.setdefault(subject, object_)
+        prefLabels = {}
+        for subject, object_ in graph.subject_objects(predicate=_PRED_PREF_LABEL):
+            prefLabels.setdefault(subject, []).append(object_)
+        rdfsLabels = {}
+        for subject, object_ in graph.subject_objects(predicate=_RDFS_LABEL):
+            rdfsLabels.setdefault(subject, []).append(object_)
+
+        # build the new concepts in a batch, merging them into the
+        # shared cache with a single update at the end rather than one
+        # dict store per concept
+        created = {}
+        prefLabels_get = prefLabels.get
+        rdfsLabels_get = rdfsLabels.get
+        for subject in subjects:
             uri = normalise_uri(subject)
 
             # Check for a preferredLabel in our desired language
             label_list = self._preferredLabel(
-                graph,
-                subject,
+                (
+                    (_PRED_PREF_LABEL, prefLabels_get(subject)),
+                    (_RDFS_LABEL, rdfsLabels_get(subject)),
+                ),
                 lang=lang,
                 default=default_label
             )
 
             label = str(label_list[0][1].value)
 
-            definition = self._get_value_for_lang(graph, subject, pred_definition, lang)
-            altLabel = self._get_value_for_lang(graph, subject, pred_altLabel, lang)
-            notation = str(graph.value(subject=subject, predicate=pred_notation))
-            note = str(graph.value(subject=subject, predicate=pred_note))
+            definition = self._get_value_for_lang(definitions.get(subject), lang)
+            altLabel = self._get_value_for_lang(altLabels.get(subject), lang)
+            notation = str(notations.get(subject))
+            note = str(notes.get(subject))
 
             debug("creating Concept %s", uri)
-            cache[uri] = Concept(uri, label, definition, notation, altLabel, note)
-            concepts.add(uri)
-
-        attrs = {
-            rdflib.URIRef(
-                "http://www.w3.org/2004/02/skos/core#narrower"
-            ): "narrower",
-            rdflib.URIRef(
-                "http://www.w3.org/2004/02/skos/core#broader"
-            ): "broader",
-            rdflib.URIRef(
-                "http://www.w3.org/2004/02/skos/core#related"
-            ): "related",
-            rdflib.URIRef(
-                "http://www.w3.org/2004/02/skos/core#exactMatch"
-            ): "synonyms",
-            rdflib.URIRef(
-                "http://www.w3.org/2006/12/owl2-xml#sameAs"
-            ): "synonyms",
-        }
-        for predicate, attr in attrs.items():
+            created[uri] = Concept(uri, label, definition, notation, altLabel, note)
+
+        cache.update(created)
+        concepts = set(created)
+
+        cache_get = cache.get
+        for predicate, attr in _RELATION_ATTRS.items():
+            # resolve each subject's target collection once per
+            # predicate rather than once per triple
+            targets = {}
             for subject, object_ in graph.subject_objects(predicate=predicate):
-                try:
-                    match = cache[normalise_uri(object_)]
-                except KeyError:
+                match = cache_get(normalise_uri(object_))
+                if match is None:
                     continue
+                target = targets.get(subject)
+                if target is None:
+                    target = getattr(cache[normalise_uri(subject)], attr)
+                    targets[subject] = target
                 debug("adding %s to %s as %s", object_, subject, attr)
-                getattr(cache[normalise_uri(subject)], attr).add(match)
+                target.add(match)
 
         return concepts
 
-    def _loadCollections(self, graph, cache):
+    def _loadCollections(self, graph, cache, normalise_uri, subjects):
         # generate all the collections
         collections = set()
-        normalise_uri = self.normalise_uri
-        pred_titles = [
-            rdflib.URIRef("http://purl.org/dc/terms/title"),
-            rdflib.URIRef("http://purl.org/dc/elements/1.1/title"),
-        ]
-        pred_descriptions = [
-            rdflib.URIRef("http://purl.org/dc/terms/description"),
-            rdflib.URIRef("http://purl.org/dc/elements/1.1/description"),
-        ]
-        pred_dates = [
-            rdflib.URIRef("http://purl.org/dc/terms/date"),
-            rdflib.URIRef("http://purl.org/dc/elements/1.1/date"),
-        ]
-        for subject in self._iterateType(graph, "Collection"):
+        for subject in subjects:
             uri = normalise_uri(subject)
             # create the basic concept
-            title = str(self._valueFromPredicates(graph, subject, pred_titles))
+            title = str(self._valueFromPredicates(graph, subject, _PRED_TITLES))
             description = str(
-                self._valueFromPredicates(graph, subject, pred_descriptions)
+                self._valueFromPredicates(graph, subject, _PRED_DESCRIPTIONS)
             )
             date = self._dcDateToDatetime(
-                self._valueFromPredicates(graph, subject, pred_dates)
+                self._valueFromPredicates(graph, subject, _PRED_DATES)
             )
             debug("creating Collection %s", uri)
             cache[uri] = Collection(uri, title, description, date)
             collections.add(uri)
 
-        for subject, object_ in graph.subject_objects(
-                predicate=rdflib.URIRef(
-                    "http://www.w3.org/2004/02/skos/core#member"
-                )
-        ):
+        for subject, object_ in graph.subject_objects(predicate=_PRED_MEMBER):
             try:
                 member = cache[normalise_uri(object_)]
             except KeyError:
@@ -853,24 +882,15 @@ class RDFLoader(collections.abc.Mapping):
                 return value
         return None
 
-    def _loadConceptSchemes(self, graph, cache):
+    def _loadConceptSchemes(self, graph, cache, normalise_uri, subjects):
         # generate all the schemes
         schemes = set()
-        normalise_uri = self.normalise_uri
-        pred_titles = [
-            rdflib.URIRef("http://purl.org/dc/terms/title"),
-            rdflib.URIRef("http://purl.org/dc/elements/1.1/title"),
-        ]
-        pred_descriptions = [
-            rdflib.URIRef("http://purl.org/dc/terms/description"),
-            rdflib.URIRef("http://purl.org/dc/elements/1.1/description"),
-        ]
-        for subject in self._iterateType(graph, "ConceptScheme"):
+        for subject in subjects:
             uri = normalise_uri(subject)
             # create the basic concept
-            title = str(self._valueFromPredicates(graph, subject, pred_titles))
+            title = str(self._valueFromPredicates(graph, subject, _PRED_TITLES))
             description = str(
-                self._valueFromPredicates(graph, subject, pred_descriptions)
+                self._valueFromPredicates(graph, subject, _PRED_DESCRIPTIONS)
             )
             debug("creating ConceptScheme %s", uri)
             cache[uri] = ConceptScheme(uri, title, description)
@@ -880,33 +900,61 @@ class RDFLoader(collections.abc.Mapping):
 
     def load(self, graph, lang="en"):
         cache = {}
-        normalise_uri = self.normalise_uri
-        self._concepts = set(
-            (normalise_uri(subj) for subj in self._iterateType(
-                graph, "Concept"
-            ))
+
+        # memoise the normaliser so each URIRef is normalised exactly
+        # once per load, however expensive the user-supplied callable is
+        memo = {}
+
+        def normalise_uri(uri, _memo=memo, _normalise=self.normalise_uri):
+            try:
+                return _memo[uri]
+            except KeyError:
+                result = _memo[uri] = _normalise(uri)
+                return result
+
+        # classify all typed subjects in a single scan of the rdf:type
+        # triples rather than one pass per SKOS type
+        self._concepts = set()
+        self._collections = set()
+        self._schemes = set()
+        type_sets = {
+            _TYPE_CONCEPT: self._concepts,
+            _TYPE_COLLECTION: self._collections,
+            _TYPE_CONCEPT_SCHEME: self._schemes,
+        }
+        type_sets_get = type_sets.get
+        for subject, object_ in graph.subject_objects(predicate=_RDF_TYPE):
+            bucket = type_sets_get(object_)
+            if bucket is not None:
+                bucket.add(normalise_uri(subject))
+        self._resolveGraph(graph, normalise_uri)
+        # a second fused scan classifies the raw subjects for the
+        # loaders; resolving may have parsed new triples into the
+        # graph, so the pre-resolution scan cannot serve both
+        typed_subjects = {
+            _TYPE_CONCEPT: [],
+            _TYPE_COLLECTION: [],
+            _TYPE_CONCEPT_SCHEME: [],
+        }
+        typed_subjects_get = typed_subjects.get
+        for subject, object_ in graph.subject_objects(predicate=_RDF_TYPE):
+            bucket = typed_subjects_get(object_)
+            if bucket is not None:
+                bucket.append(subject)
+        self._flat_concepts = self._loadConcepts(
+            graph, cache, lang, normalise_uri, typed_subjects[_TYPE_CONCEPT]
         )
-        self._collections = set(
-            (normalise_uri(subj) for subj in self._iterateType(
-                graph, "Collection"
-            ))
+        self._flat_collections = self._loadCollections(
+            graph, cache, normalise_uri, typed_subjects[_TYPE_COLLECTION]
         )
-        self._schemes = set(
-            (normalise_uri(subj) for subj in self._iterateType(
-                graph, "ConceptScheme"
-            ))
+        self._flat_schemes = self._loadConceptSchemes(
+            graph, cache, normalise_uri, typed_subjects[_TYPE_CONCEPT_SCHEME]
         )
-        self._resolveGraph(graph)
-        self._flat_concepts = self._loadConcepts(graph, cache, lang)
-        self._flat_collections = self._loadCollections(graph, cache)
-        self._flat_schemes = self._loadConceptSchemes(graph, cache)
         self._flat_cache = cache  # all objects
-        self._cache = dict(
-            (uri, cache[uri])
-            for uri in (
-                chain(self._concepts, self._schemes, self._collections)
-            )
-        )
+        self._cache = {
+            uri: cache[uri]
+            for uri in chain(self._concepts, self._schemes, self._collections)
+        }
 
     def _getAttr(self, name, flat=None):
         if flat is None:
@@ -954,6 +1002,55 @@ class RDFLoader(collections.abc.Mapping):
         return Concepts([cache[key] for key in collections])
 
 
+def _fastURIRef(value, _new=str.__new__, _cls=rdflib.URIRef):
+    """
+    Construct a `rdflib.URIRef` without URI validation
+
+    The builder's URIs come from the object model, where they have
+    already been through a parser or the caller's hands, so the
+    per-term validation in `URIRef.__new__` is pure overhead on this
+    hot path. `str.__new__` builds an identical term directly.
+    """
+    return _new(_cls, value)
+
+
+# translation table covering the characters N-Triples requires escaping
+# in literals
+_NT_ESCAPES = {
+    ord("\\"): "\\\\",
+    ord('"'): '\\"',
+    ord("\n"): "\\n",
+    ord("\r"): "\\r",
+}
+
+
+def _toNTriples(triples):
+    """
+    Serialise an iterable of builder quads to an N-Triples string
+    """
+    lines = []
+    append = lines.append
+    for subject, predicate, object_, _ in triples:
+        if isinstance(object_, rdflib.Literal):
+            object_nt = '"%s"' % str(object_).translate(_NT_ESCAPES)
+        else:
+            object_nt = "<%s>" % object_
+        append("<%s> <%s> %s .\n" % (subject, predicate, object_nt))
+    return "".join(lines)
+
+
+def _buildShard(objects):
+    """
+    Worker for `RDFBuilder.build(..., workers=N)`
+
+    Serialises a shard of objects into a throwaway graph in a separate
+    process and returns the resulting triples for merging.
+    """
+    graph = rdflib.Graph()
+    RDFBuilder().build(objects, graph)
+    return list(graph)
+
+
 class RDFBuilder(object):
     """
     Creates a RDF graph from Python SKOS objects
@@ -968,111 +1065,175 @@ class RDFBuilder(object):
         self.SKOS = rdflib.Namespace("http://www.w3.org/2004/02/skos/core#")
         self.DC = rdflib.Namespace("http://purl.org/dc/elements/1.1/")
 
-    def getGraph(self):
-        # Instantiate the graph
-        graph = rdflib.Graph()
+        # a template graph holding the prefix bindings; graphs handed
+        # out by `getGraph` share its namespace manager so the binds
+        # happen once per builder rather than once per graph. It is
+        # created lazily on the first `getGraph` call so builders used
+        # purely for streaming never pay for the binds at all
+        self._template = None
 
-        # Bind a few prefix, namespace pairs.
-        graph.bind("dc", "http://purl.org/dc/elements/1.1/")
-        graph.bind("skos", "http://www.w3.org/2004/02/skos/core#")
+    def getGraph(self):
+        # Instantiate the graph, sharing the pre-bound namespace
+        # manager from the template; the store is Oxigraph-backed when
+        # oxrdflib is installed
+        if self._template is None:
+            self._template = rdflib.Graph()
+            self._template.bind("dc", "http://purl.org/dc/elements/1.1/")
+            self._template.bind("skos", "http://www.w3.org/2004/02/skos/core#")
+        graph = rdflib.Graph(store=_GRAPH_STORE)
+        graph.namespace_manager = self._template.namespace_manager
         return graph
 
     def objectInGraph(self, obj, graph):
         obj_name = obj.__class__.__name__
-        pred_uri = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
         return (
             rdflib.term.URIRef(obj.uri),
-            rdflib.term.URIRef(pred_uri),
-            rdflib.term.URIRef(
-                "http://www.w3.org/2004/02/skos/core#%s" % obj_name
-            ),
+            _RDF_TYPE,
+            _SKOS[obj_name],
         ) in graph
 
     def buildConcept(self, graph, concept):
         """
         Add a `skos.Concept` instance to a RDF graph
         """
-        if self.objectInGraph(concept, graph):
-            return
+        self.build([concept], graph)
 
-        node = rdflib.URIRef(concept.uri)
-        graph.add((
-            node,
-            rdflib.RDF.type,
-            self.SKOS["Concept"]
-        ))
-        graph.add((
-            node,
-            self.SKOS["notation"],
-            rdflib.Literal(concept.notation)
-        ))
-        graph.add((
-            node,
-            self.SKOS["prefLabel"],
-            rdflib.Literal(concept.prefLabel)
-        ))
-        graph.add((
-            node,
-            self.SKOS["definition"],
-            rdflib.Literal(concept.definition)
-        ))
-        graph.add((
-            node,
-            self.SKOS["altLabel"],
-            rdflib.Literal(concept.altLabel)
-        ))
-        graph.add((
-            node,
-            self.SKOS["note"],
-            rdflib.Literal(concept.note)
-        ))
-
-        for uri, syn in concept.synonyms.items():
-            graph.add((node, self.SKOS["exactMatch"], rdflib.URIRef(uri)))
-            self.buildConcept(graph, syn)
-
-        for uri, related in concept.related.items():
-            graph.add((node, self.SKOS["related"], rdflib.URIRef(uri)))
-            self.buildConcept(graph, related)
-
-        for uri, broader in concept.broader.items():
-            graph.add((node, self.SKOS["broader"], rdflib.URIRef(uri)))
-            self.buildConcept(graph, broader)
+    def buildCollection(self, graph, collection):
+        """
+        Add a `skos.Collection` instance to a RDF graph
+        """
+        self.build([collection], graph)
 
-        for uri, narrower in concept.narrower.items():
-            graph.add((node, self.SKOS["narrower"], rdflib.URIRef(uri)))
-            self.buildConcept(graph, narrower)
+    def _flatten(self, objects):
+        """
+        Return the transitive closure of `objects` as a flat list
 
-        for c in concept.collections.values():
-            self.buildCollection(graph, c)
+        The first pass of a build: an iterative walk over the object
+        graph collecting each reachable object exactly once, so the
+        emit pass can run as a single flat loop with no re-entry
+        checks.  Cycles are broken by the visited set; emission order
+        is irrelevant as the triples form a set.
+        """
+        work = collections.deque(objects)
+        visited = set()
+        order = []
+        append = order.append
+        while work:
+            obj = work.popleft()
+            uri = obj.uri
+            if uri in visited:
+                continue
+            visited.add(uri)
+            append(obj)
+            if isinstance(obj, Concept):
+                for mapping in (
+                    obj.synonyms,
+                    obj.related,
+                    obj.broader,
+                    obj.narrower,
+                    obj.collections,
+                ):
+                    # only enqueue children which still need building;
+                    # the loop re-checks on pop, but filtering here
+                    # keeps the deque from ballooning on densely
+                    # connected vocabularies
+                    work.extend(
+                        child
+                        for child in mapping.values()
+                        if child.uri not in visited
+                    )
+            else:
+                work.extend(
+                    member
+                    for member in obj.members.values()
+                    if member.uri not in visited
+                )
+        return order
 
-    def buildCollection(self, graph, collection):
+    def _emitConcept(self, graph, concept, triples, nodes):
         """
-        Add a `skos.Collection` instance to a RDF graph
+        Append a Concept's quads to `triples`
         """
-        if self.objectInGraph(collection, graph):
-            return
+        node = nodes.get(concept.uri)
+        if node is None:
+            node = nodes[concept.uri] = _fastURIRef(concept.uri)
+        add = triples.append
+        literal = rdflib.Literal
+        add((node, _RDF_TYPE, _TYPE_CONCEPT, graph))
+        # only emit attributes which actually carry a value; None or
+        # empty attributes would otherwise become junk literals
+        for predicate, value in (
+            (_PRED_NOTATION, concept.notation),
+            (_PRED_PREF_LABEL, concept.prefLabel),
+            (_PRED_DEFINITION, concept.definition),
+            (_PRED_ALT_LABEL, concept.altLabel),
+            (_PRED_NOTE, concept.note),
+        ):
+            if value:
+                add((node, predicate, literal(value), graph))
+
+        # emit all four relation fields through one predicate-keyed
+        # loop, extending the accumulator with the edge quads in bulk
+        extend = triples.extend
+        nodes_get = nodes.get
+        nodes_setdefault = nodes.setdefault
+        uriref = _fastURIRef
+        for predicate, mapping in (
+            (_PRED_EXACT_MATCH, concept.synonyms),
+            (_PRED_RELATED, concept.related),
+            (_PRED_BROADER, concept.broader),
+            (_PRED_NARROWER, concept.narrower),
+        ):
+            extend(
+                (
+                    node,
+                    predicate,
+                    nodes_get(uri) or nodes_setdefault(uri, uriref(uri)),
+                    graph,
+                )
+                for uri in mapping
+            )
 
-        node = rdflib.URIRef(collection.uri)
-        graph.add((node, rdflib.RDF.type, self.SKOS["Collection"]))
-        graph.add((node, self.DC["title"], rdflib.Literal(collection.title)))
-        graph.add((
+    def _emitCollection(self, graph, collection, triples, nodes):
+        """
+        Append a Collection's quads to `triples`
+        """
+        node = nodes.get(collection.uri)
+        if node is None:
+            node = nodes[collection.uri] = _fastURIRef(collection.uri)
+        add = triples.append
+        add((node, _RDF_TYPE, _TYPE_COLLECTION, graph))
+        if collection.title:
+            add((node, _DC_TITLE, rdflib.Literal(collection.title), graph))
+        if collection.description:
+            add((
                 node,
-                self.DC["description"],
-                rdflib.Literal(collection.description)
-        ))
-        try:
-            date = collection.date.isoformat()
-        except AttributeError:
-            pass
-        else:
-            graph.add((node, self.DC["date"], rdflib.Literal(date)))
-
-        for uri, member in collection.members.items():
-            graph.add((node, self.SKOS["member"], rdflib.URIRef(uri)))
-            self.buildConcept(graph, member)
+                _DC_DESCRIPTION,
+                rdflib.Literal(collection.description),
+                graph,
+            ))
+        # an explicit None check rather than catching AttributeError:
+        # undated collections are common and exception handling on that
+        # path is pure overhead
+        date = collection.date
+        if date is not None:
+            add((node, _DC_DATE, rdflib.Literal(date.isoformat()), graph))
+
+        members = collection.members
+        nodes_get = nodes.get
+        nodes_setdefault = nodes.setdefault
+        uriref = _fastURIRef
+        triples.extend(
+            (
+                node,
+                _PRED_MEMBER,
+                nodes_get(uri) or nodes_setdefault(uri, uriref(uri)),
+                graph,
+            )
+            for uri in members
+        )
 
-    def build(self, objects, graph=None):
+    def build(self, objects, graph=None, workers=None, fast=False):
         """
         Create an RDF graph from Python SKOS objects
 
@@ -1081,16 +1242,80 @@ class RDFBuilder(object):
         objects are added to the graph rather than creating a new
         `Graph` instance.  An empty graph can be created with the
         `getGraph` method.
+
+        If `workers` is given the objects are partitioned into that
+        many shards which are serialised in parallel worker processes
+        and merged into the target graph. This pays off on large
+        vocabularies where term construction dominates; objects must be
+        picklable (detached model instances are).
+
+        If `fast` is set the accumulated triples are serialised to an
+        N-Triples buffer and handed to the graph's parser in one shot
+        instead of being inserted one by one via `addN` — the faster
+        path for very large outputs. Object URIs must be absolute, as
+        the N-Triples grammar requires.
         """
         if graph is None:
             graph = self.getGraph()
 
-        for obj in objects:
-            try:
-                obj.prefLabel
-            except AttributeError:
-                self.buildCollection(graph, obj)
+        if workers:
+            objects = list(objects)
+            if len(objects) > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                workers = min(int(workers), len(objects))
+                shards = [objects[i::workers] for i in range(workers)]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = pool.map(_buildShard, shards)
+                merged = (
+                    (subject, predicate, object_, graph)
+                    for triples in results
+                    for subject, predicate, object_ in triples
+                )
+                # the merged shard triples take the same fast or addN
+                # path as a serial build
+                if fast:
+                    graph.parse(data=_toNTriples(merged), format="nt")
+                else:
+                    graph.addN(merged)
+                return graph
+
+        # two passes replace the previous mutual recursion: `_flatten`
+        # computes the set of objects to build once, then this flat
+        # loop emits each exactly once with no re-entry checks
+        triples = []
+        nodes = {}
+        for obj in self._flatten(objects):
+            if isinstance(obj, Concept):
+                self._emitConcept(graph, obj, triples, nodes)
             else:
-                self.buildConcept(graph, obj)
+                self._emitCollection(graph, obj, triples, nodes)
 
+        # emit everything in a single batch insert
+        if fast:
+            graph.parse(data=_toNTriples(triples), format="nt")
+        else:
+            graph.addN(triples)
         return graph
+
+    def buildToStream(self, objects, fp):
+        """
+        Serialise Python SKOS objects straight to a stream
+
+        Writes the objects to `fp` (a text-mode file-like object) as
+        N-Triples while they are generated, never materialising an
+        `rdflib.Graph` — the export-only counterpart to `build` with a
+        fraction of its peak memory. Object URIs must be absolute, as
+        the N-Triples grammar requires.
+        """
+        triples = []
+        nodes = {}
+        write = fp.write
+        for obj in self._flatten(objects):
+            if isinstance(obj, Concept):
+                self._emitConcept(None, obj, triples, nodes)
+            else:
+                self._emitCollection(None, obj, triples, nodes)
+            # flush each object's triples as soon as they are built
+            write(_toNTriples(triples))
+            del triples[:]
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 from python_skos import skos
+import io
+import rdflib
 import unittest
 from datetime import datetime
 from iso8601.iso8601 import UTC
@@ -43,6 +45,54 @@ class TestCase(unittest.TestCase):
             loader_obj = loader[obj.uri]
             self.assertEqual(loader_obj, obj)
 
+    def testBuildParallel(self):
+        objects = self.getConcepts()
+        objects.append(self.getCollection())
+        graph = self.builder.build(objects, workers=2)
+        self.assertEqual(len(graph), 18)
+
+        reference = self.builder.build(objects)
+        self.assertEqual(set(graph), set(reference))
+
+    def testBuildFast(self):
+        # the fast path parses N-Triples, which requires absolute URIs
+        objects = [
+            skos.Concept(
+                "http://example.com/uri%d" % i,
+                "prefLabel%d" % i,
+                "definition%d" % i,
+                "notation%d" % i,
+                "altLabel%d" % i,
+                "note%d" % i,
+            )
+            for i in (1, 2)
+        ]
+        collection = skos.Collection(
+            "http://example.com/collection",
+            "title",
+            "description",
+            datetime(2012, 5, 24, 20, 35, 34, 489923, UTC),
+        )
+        collection.members = objects[:]
+        objects.append(collection)
+
+        graph = self.builder.build(objects, fast=True)
+        self.assertEqual(len(graph), 18)
+
+        reference = self.builder.build(objects)
+        self.assertEqual(set(graph), set(reference))
+
+        # the fast path also applies to parallel builds
+        parallel = self.builder.build(objects, workers=2, fast=True)
+        self.assertEqual(set(parallel), set(reference))
+
+        # the streamed output parses back to the same graph
+        stream = io.StringIO()
+        self.builder.buildToStream(objects, stream)
+        streamed = rdflib.Graph()
+        streamed.parse(data=stream.getvalue(), format="nt")
+        self.assertEqual(set(streamed), set(reference))
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)